@@ -10,6 +10,8 @@ class DataContainer(ABC):
     enforces such a method on its subclasses.
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def to_database_format(self):
         """Returns the contents of the instance in a dictionary
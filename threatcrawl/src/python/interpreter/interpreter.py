@@ -972,7 +972,7 @@ class Interpreter:
 
         # Sections/subsections can be present on the same page with threads so account for this
         if section_list is not None and subsection_list is not None:
-            if len(section_list.get_elements(page)) > len(subsection_list.get_elements(page)):
+            if section_list.get_number_of_elements(page) > subsection_list.get_number_of_elements(page):
                 parsed_data.section_list = section_list
                 parsed_data.section_button = None
                 parsed_data.subsection_list = subsection_list
@@ -1103,7 +1103,7 @@ class Interpreter:
         found = {}
         for page_type, element in self.__structure.items():
             for elm, identifier in element.items():
-                if not identifier.get_elements(page) and elm != NavigationalElement.PreviousPageButton and \
+                if identifier.get_number_of_elements(page) == 0 and elm != NavigationalElement.PreviousPageButton and \
                         elm != NavigationalElement.NextPageButton:
                     if page_type in found.keys():
                         found[page_type] += 1
@@ -234,7 +234,7 @@ class InterpreterData:
         elif self.__section_list is not None and self.__subsection_list is not None:
             # If both exist, check which one contains the links to the sections/subsections and which one is just
             # a few buttons
-            if len(self.__section_list.get_elements(page)) > len(self.__subsection_list.get_elements(page)):
+            if self.__section_list.get_number_of_elements(page) > self.__subsection_list.get_number_of_elements(page):
                 self.__nrof_words = count_words(page_type, self.__posts_content, self.__section_list, page)
             else:
                 self.__nrof_words = count_words(page_type, self.__posts_content, self.__subsection_list, page)
@@ -465,7 +465,7 @@ class InterpreterData:
                 self.is_thread_complete = False
             elif self.__posts_per_page >= len(self.__posts_content):
                 # If next page button is on the page, we are not done yet. Otherwise I assume we are done.
-                if self.__structure[page_type][NavigationalElement.NextPageButton].get_elements(page):
+                if self.__structure[page_type][NavigationalElement.NextPageButton].get_number_of_elements(page) > 0:
                     # Check if the posts per page are larger than the found amount of posts. This indicates missing data
                     if self.__posts_per_page > len(self.__posts_content):
                         Logger.log("warning", "Page is badly formatted! Found less posts ({}) on this page than usual "
@@ -47,8 +47,7 @@ def count_words(page_type: PageType, posts_content: Optional[List[str]], link_li
         if link_list is not None and isinstance(link_list, ResourceIdentifier) and page is not None and \
                 isinstance(page, str):
             # Retrieve HTML elements from ResourceIdentifier and strip tags.
-            links = link_list.get_elements(page)
-            for link in links:
+            for link in link_list.iter_elements(page):
                 count += len(get_text_content(link).split())
         else:
             # Not on a ThreadPage and no links to read, or has no page to read from. Difficult to read words then...
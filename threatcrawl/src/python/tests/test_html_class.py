@@ -0,0 +1,36 @@
+"""Tests for the HTMLClass resource identifier."""
+from trainer.html_class import HTMLClass
+
+HTML = """
+<html><body>
+    <div class="post content">first</div>
+    <div class="extra content post">second</div>
+    <div class="post">third</div>
+    <span class="title">fourth</span>
+    <p>fifth</p>
+</body></html>
+"""
+
+
+def test_single_class_entries():
+    identifier = HTMLClass(['post', 'title'])
+    assert identifier.get_number_of_elements(HTML) == 4
+
+
+def test_multi_class_entry_requires_all_classes():
+    identifier = HTMLClass(['post content'])
+    elements = identifier.get_elements(HTML)
+    assert len(elements) == 2
+    assert 'first' in elements[0]
+    assert 'second' in elements[1]
+
+
+def test_mixed_entries():
+    identifier = HTMLClass(['post content', 'title'])
+    assert identifier.get_number_of_elements(HTML) == 3
+
+
+def test_multi_class_entry_css_selector():
+    # The selector used in the browser has to select the same elements as the one used on the HTML
+    identifier = HTMLClass(['post content', 'title'])
+    assert identifier._css_selector == '.post.content,.title'
@@ -79,17 +79,8 @@ class AnalyzerMethod1(AbstractAnalyzer):
         if len(common_classes) == 0:
             return None
         else:
-            list_common_classes = list(common_classes)
-            remaining_classes = len(list_common_classes)
-            xpath = "[@class='"
-            for c in list_common_classes:
-                remaining_classes -= 1
-                if remaining_classes == 0:
-                    xpath = xpath + c + "']"
-                else:
-                    xpath = xpath + c + "' and @class='"
-
-            return XPath(xpath)
+            class_predicates = "' and @class='".join(common_classes)
+            return XPath(f"[@class='{class_predicates}']")
 
         # TODO: probably not a good idea to have an identifier that uses all the classes attached to the html element.
         #  instead we should somehow find a way to get the relevant class(es) out of the list
@@ -8,10 +8,14 @@ from trainer.abstract_analyzer import AbstractAnalyzer
 from trainer.html_element import HTMLElement
 from trainer.xpath import XPath
 from trainer.xpath_except import XPathExcept
-from trainer.xpath_helper_functions import calculate_common_xpath, combine_x_path_by_or, verify_common_x_path
+from trainer.xpath_helper_functions import calculate_common_xpath, combine_x_path_by_or, \
+    verify_common_x_path_from_html
 from enums import DataElement, StructuralElement
 from utils import Logger
-from re import search
+import re
+
+# Matches the first anchor step of an XPath
+_ANCHOR_STEP = re.compile("/a([.*?])??")
 
 
 class AnalyzerMethod2(AbstractAnalyzer):
@@ -56,15 +60,14 @@ class AnalyzerMethod2(AbstractAnalyzer):
         if structural_element == DataElement.SectionTitle or structural_element == DataElement.SubsectionTitle or \
                 structural_element == DataElement.ThreadTitle:
             x_path = x_path_use.x_path
-            x_path_regex = "/a([.*?])??"
-            res = search(x_path_regex, x_path)
+            res = _ANCHOR_STEP.search(x_path)
 
             # If there is no match for an a element in the XPath, ignore the following code that forces the use of an a
             # element.
             if res is not None:
                 end_idx = res.end()
                 new_x_path = x_path[8:end_idx]
-                if not verify_common_x_path(new_x_path, x_path[8:], page_html):
+                if not verify_common_x_path_from_html(new_x_path, x_path[8:], page_html):
                     Logger.log("trainer", "Analyzer method 2 Verification of new common path failed")
                     # return None
                 else:
@@ -16,6 +16,13 @@ from enums.input_element import InputElement
 from enums.data_element import DataElement
 import re
 
+# Characters that make a text unusable in an XPath text predicate: quotation marks and digits
+_BAD_TEXT = re.compile(r'[\'"\d]')
+# Cyrillic characters, XPaths containing them are not considered
+_CYRILLIC = re.compile('[а-яА-Я]')
+# Attributes whose value is free text, only used in a predicate if the text is useful
+_TEXT_ATTRIBUTES = frozenset(('title', 'alt'))
+
 
 class AnalyzerMethod3(AbstractAnalyzer):
     """Class for constructing resource identifiers for HTML elements.
@@ -29,6 +36,8 @@ class AnalyzerMethod3(AbstractAnalyzer):
         self.priority_attributes = ['name', 'class', 'rel', 'title', 'alt', 'value']
         self.blacklisted_attributes = {'href', 'src', 'onclick', 'onload', 'tabindex', 'width', 'height', 'style',
                                        'size', 'maxLength', 'id'}
+        # Attributes that are not added by the generic attribute loop, in a set for constant-time membership checks
+        self.skipped_attributes = self.blacklisted_attributes.union(self.priority_attributes)
 
     def construct_identifier(self, page_html: str, selected_elements: List[HTMLElement],
                              ignored_elements: List[HTMLElement], structural_element: StructuralElement,
@@ -99,6 +108,7 @@ class AnalyzerMethod3(AbstractAnalyzer):
         rest_elements = [html_obj.xpath(x_path)[0] for x_path in x_path_rest_elements]
 
         ancestor_list = self.calculate_ancestor_list(x_path_element, html_obj)
+        max_level = len(ancestor_list) - 1
 
         x_path_list = ['//*']
         sufficient_x_paths = []
@@ -113,16 +123,16 @@ class AnalyzerMethod3(AbstractAnalyzer):
             temp += self.transf_add_text(current_x_path, ancestor_list)
             temp += self.transf_add_attribute(current_x_path, ancestor_list)
             # temp += self.transf_add_attribute_set(current_x_path, ancestor_list)
-            temp += self.transf_add_position(current_x_path, ancestor_list)
-            temp += self.transf_add_level(current_x_path, ancestor_list)
+            temp += self.transf_add_position(current_x_path, ancestor_list, max_level)
+            temp += self.transf_add_level(current_x_path, max_level)
 
             for x_path in temp:
-                if not bool(re.search('[а-яА-Я]', x_path)):
-                    (sufficient, identifier, count) = \
+                if _CYRILLIC.search(x_path) is None:
+                    (sufficient, x_path, xpaths_ignored_but_identified, count) = \
                         self.uniquely_identifies(x_path, ancestor_list[0], rest_elements, x_paths_ignored_elements,
                                                  html_obj, structural_element)
                     if sufficient:
-                        sufficient_x_paths.append((identifier, count))
+                        sufficient_x_paths.append((x_path, xpaths_ignored_but_identified, count))
                     else:
                         x_path_list.append(x_path)
 
@@ -130,8 +140,13 @@ class AnalyzerMethod3(AbstractAnalyzer):
             return None
 
         # print(sufficient_x_paths)
-        (minimal_x_path, _) = min(sufficient_x_paths, key=lambda t: t[1])
-        return minimal_x_path
+        # Only the winning candidate is turned into a resource identifier
+        (minimal_x_path, xpaths_ignored_but_identified, _) = min(sufficient_x_paths, key=lambda t: t[2])
+        x_path_use = XPath('/html/body' + minimal_x_path)
+        if len(xpaths_ignored_but_identified) == 0:
+            return x_path_use
+        x_path_ignore = XPath(combine_x_path_by_or(xpaths_ignored_but_identified))
+        return XPathExcept(x_path_use, x_path_ignore)
 
     def uniquely_identifies(self, x_path, element, other_selected_elements, ignored_element_xpaths,
                             html_obj, structural_element):
@@ -154,9 +169,10 @@ class AnalyzerMethod3(AbstractAnalyzer):
 
         Returns
         -------
-        (sufficient, identifier, count) : (bool, ResourceIdentifier or None, int)
+        (sufficient, x_path, xpaths_ignored_but_identified, count) : (bool, str, list of str, int)
             `sufficient` indicates whether the `x_path` identifies the `element` and `other_selected_elements`;
-            `identifier` is the ResourceIdentifier, if `sufficient` is true, otherwise it is None'
+            `x_path` is the evaluated XPath, from which the resource identifier is built only if it is selected;
+            `xpaths_ignored_but_identified` are the XPaths of the ignored elements that `x_path` identifies anyway;
             `count` indicates how bad the `x_path` is.
         """
         # print("Considering:", x_path)
@@ -186,14 +202,7 @@ class AnalyzerMethod3(AbstractAnalyzer):
             if found:
                 xpaths_ignored_but_identified.append(ignored_element_xpath)
 
-        if len(xpaths_ignored_but_identified) == 0:
-            return correct, XPath('/html/body' + x_path), count
-        elif correct:
-            x_path_use = XPath('/html/body' + x_path)
-            x_path_ignore = XPath(combine_x_path_by_or(xpaths_ignored_but_identified))
-            return correct, XPathExcept(x_path_use, x_path_ignore), count
-        else:
-            return correct, None, count
+        return correct, x_path, xpaths_ignored_but_identified, count
 
     def calculate_ancestor_list(self, x_path_element, html_obj):
         """Calculate list of ancestors of an element.
@@ -207,17 +216,13 @@ class AnalyzerMethod3(AbstractAnalyzer):
 
         Returns
         -------
-        list of lxml Element
-            List of lxml Elements containing all ancestors including the element itself.
+        tuple of lxml Element
+            Tuple of lxml Elements containing all ancestors including the element itself.
         """
         # Get ElementUnicodeResult based on x_path
         element = html_obj.xpath(x_path_element)[0]
 
-        ancestors = [element]
-        for ancestor in element.iterancestors():
-            ancestors.append(ancestor)
-
-        return ancestors
+        return (element, *element.iterancestors())
 
     def transf_convert_star(self, x_path, ancestor_list):
         """Replace the star (*) in the XPath which starts with "//*" with the tag name.
@@ -226,7 +231,7 @@ class AnalyzerMethod3(AbstractAnalyzer):
         ----------
         x_path : str
             The XPath expression start with "//*".
-        ancestor_list : list of lxml Element
+        ancestor_list : tuple of lxml Element
             List of lxml Elements containing all ancestors including the element itself.
 
         Returns
@@ -250,7 +255,7 @@ class AnalyzerMethod3(AbstractAnalyzer):
         ----------
         x_path : str
             The XPath str that does not contain predicates
-        ancestor_list : list of lxml Element
+        ancestor_list : tuple of lxml Element
             List of lxml Elements containing all ancestors including the element itself.
 
         Returns
@@ -261,8 +266,9 @@ class AnalyzerMethod3(AbstractAnalyzer):
         x_path_list = []
         current_ancestor = self.get_current_ancestor(x_path, ancestor_list)
 
-        if (not self.head_has_any_predicates(x_path)) and current_ancestor.attrib.get('id'):
-            predicate = f"[@id='{current_ancestor.attrib.get('id')}']"
+        element_id = current_ancestor.get('id')
+        if (not self.head_has_any_predicates(x_path)) and element_id:
+            predicate = f"[@id='{element_id}']"
             x_path_list.append(self.add_predicate_to_head(x_path, predicate))
 
         return x_path_list
@@ -274,7 +280,7 @@ class AnalyzerMethod3(AbstractAnalyzer):
         ----------
         x_path : str
             The XPath to modify.
-        ancestor_list : list of lxml Element
+        ancestor_list : tuple of lxml Element
             The list of ancestors of the target element.
 
         Returns
@@ -304,7 +310,7 @@ class AnalyzerMethod3(AbstractAnalyzer):
         ----------
         x_path : str
             The XPath to modify.
-        ancestor_list : list of lxml Element
+        ancestor_list : tuple of lxml Element
             The list of ancestors of the target element.
 
         Returns
@@ -316,32 +322,36 @@ class AnalyzerMethod3(AbstractAnalyzer):
         current_ancestor = self.get_current_ancestor(x_path, ancestor_list)
 
         if not self.head_has_any_predicates(x_path):
+            # Read the attributes from lxml once, instead of going through a new attrib proxy for every lookup
+            attributes = dict(current_ancestor.items())
             for attribute in self.priority_attributes:
-                value = current_ancestor.attrib.get(attribute)
+                value = attributes.get(attribute)
                 if value is None:
                     continue
-                if attribute in ["title", "alt"] and not self.text_is_useful(value):
+                if attribute in _TEXT_ATTRIBUTES and not self.text_is_useful(value):
                     continue
                 value = value.strip()
                 predicate = f"[@{attribute}='{value}']"
                 x_path_list.append(self.add_predicate_to_head(x_path, predicate))
 
-            for attribute, value in current_ancestor.attrib.items():
-                if attribute not in self.priority_attributes and attribute not in self.blacklisted_attributes:
+            for attribute, value in attributes.items():
+                if attribute not in self.skipped_attributes:
                     predicate = f"[@{attribute}='{value}']"
                     x_path_list.append(self.add_predicate_to_head(x_path, predicate))
 
         return reversed(x_path_list)
 
-    def transf_add_position(self, x_path, ancestor_list):
+    def transf_add_position(self, x_path, ancestor_list, max_level):
         """Add the position of the ancestor of the given x_path if x_path has an ancestor.
 
         Parameters
         ----------
         x_path : str
             The XPath to modify.
-        ancestor_list : list of lxml Element
-            The list of ancestors of the target element.
+        ancestor_list : tuple of lxml Element
+            The ancestors of the target element.
+        max_level : int
+            The highest level an XPath can reach, i.e. the index of the last element in `ancestor_list`.
 
         Returns
         -------
@@ -354,7 +364,7 @@ class AnalyzerMethod3(AbstractAnalyzer):
         current_ancestor = ancestor_list[N]
         if not self.head_has_position_predicate(x_path):
             position = 1
-            if N + 1 < len(ancestor_list):
+            if N < max_level:
                 if x_path.startswith('//*'):
                     parent_of_ancestor = ancestor_list[N+1]
                     position = parent_of_ancestor.getchildren().index(current_ancestor) + 1
@@ -375,16 +385,16 @@ class AnalyzerMethod3(AbstractAnalyzer):
         # TODO: Maybe implement
         return []
 
-    def transf_add_level(self, x_path, ancestor_list):
+    def transf_add_level(self, x_path, max_level):
         """"Add level of x_path by add '//*' at the top of x_path if the level of xpath is smaller than
-        the length of ancestor_list
+        the highest level available in the ancestor list
 
         Parameters
         ----------
         x_path : str
             The XPath to modify.
-        ancestor_list : list of lxml Element
-            The list of ancestors of the target element.
+        max_level : int
+            The highest level an XPath can reach, i.e. the index of the last element in the ancestor list.
 
         Returns
         -------
@@ -392,7 +402,7 @@ class AnalyzerMethod3(AbstractAnalyzer):
             A list containing only the modified XPath, or an empty list.
         """
         x_path_list = []
-        if self.calculate_level_of_xpath(x_path) < len(ancestor_list) - 1:
+        if self.calculate_level_of_xpath(x_path) < max_level:
             x_path_list.append('//*' + x_path[1:])
         return x_path_list
 
@@ -403,7 +413,7 @@ class AnalyzerMethod3(AbstractAnalyzer):
         ----------
         x_path : str
             The XPath to modify.
-        ancestor_list : list of lxml Element
+        ancestor_list : tuple of lxml Element
             The list of ancestors of the target element.
 
         Returns
@@ -428,13 +438,41 @@ class AnalyzerMethod3(AbstractAnalyzer):
             The level of the given x_path
         """
         pieces = x_path.split('/')
-        level = -1
+        return len(pieces) - pieces.count('') - 1
 
-        for piece in pieces:
-            if piece != '':
-                level += 1
+    def _head_end(self, x_path):
+        """Return the index at which the head of `x_path` ends.
 
-        return level
+        The XPaths built by this class always start with '//', hence the head is the step between the leading '//'
+        and the next '/'. Looking it up with `str.find` avoids splitting the whole XPath for every check.
+
+        Parameter
+        ---------
+        x_path : str
+            The XPath starting with '//'.
+
+        Returns
+        -------
+        int
+            The index of the '/' following the head, or the length of `x_path` if the head is the last step.
+        """
+        end = x_path.find('/', 2)
+        return len(x_path) if end == -1 else end
+
+    def _head(self, x_path):
+        """Return the head of `x_path`, e.g. 'div[2]' for '//div[2]/a'.
+
+        Parameter
+        ---------
+        x_path : str
+            The XPath starting with '//'.
+
+        Returns
+        -------
+        str
+            The first step of `x_path`.
+        """
+        return x_path[2:self._head_end(x_path)]
 
     def head_has_any_predicates(self, x_path):
         """Return whether `x_path` has any predictates, for example, have format like '//class[@a = 0]'
@@ -449,7 +487,7 @@ class AnalyzerMethod3(AbstractAnalyzer):
         boolean
             Whether `x_path` has any predictates
         """
-        return '[' in x_path.split('/')[2]
+        return '[' in self._head(x_path)
 
     def head_has_position_predicate(self, x_path):
         """Return whether `x_path` has any position predictates, for example, have format like '//div[3]'
@@ -464,8 +502,10 @@ class AnalyzerMethod3(AbstractAnalyzer):
         boolean
             Whether `x_path` has any position predictates
         """
-        head = x_path.split('/')[2]
-        return bool(re.search('[\\[0-9\\]]', head))
+        # A position predicate is always the last predicate added to the head, e.g. div[@class='a'][3]
+        head = self._head(x_path)
+        bracket = head.rfind('[')
+        return bracket != -1 and head[bracket + 1:-1].isdigit()
 
     def head_has_text_predicate(self, x_path):
         """Return whether `x_path` has any text predictates, for example, have format like '//Word[text()='July']'
@@ -480,7 +520,7 @@ class AnalyzerMethod3(AbstractAnalyzer):
         boolean
             Whether `x_path` has any text predictates
         """
-        return 'text()' in x_path.split('/')[2]
+        return 'text()' in self._head(x_path)
 
     def add_predicate_to_head(self, x_path, predicate):
         """Return a new XPath str with predicate added in the head
@@ -495,9 +535,8 @@ class AnalyzerMethod3(AbstractAnalyzer):
         str
             A new XPath str with predicate added in the head
         """
-        splitXPath = x_path.split('/')
-        splitXPath[2] += predicate
-        return '/'.join(splitXPath)
+        end = self._head_end(x_path)
+        return x_path[:end] + predicate + x_path[end:]
 
     def text_is_useful(self, text):
         """Return whether the text in XPath is useful.
@@ -515,11 +554,7 @@ class AnalyzerMethod3(AbstractAnalyzer):
         boolean
             Whether the given text is useful.
         """
-
-        if text is None or text == '':
-            return False
-        else:
-            return not (len(text) > 50 or "'" in text or '"' in text or any(char.isdigit() for char in text))
+        return bool(text) and len(text) <= 50 and _BAD_TEXT.search(text) is None
 
     # def powerset(self, iterable):
     #     s = list(iterable)
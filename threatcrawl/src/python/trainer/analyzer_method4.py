@@ -9,7 +9,7 @@ from enums import StructuralElement
 from trainer.abstract_analyzer import AbstractAnalyzer
 from trainer.html_element import HTMLElement
 from trainer.xpath import XPath
-from trainer.xpath_helper_functions import calculate_xpath, calculate_common_xpath
+from trainer.xpath_helper_functions import calculate_xpath, calculate_xpaths, calculate_common_xpath
 
 
 class AnalyzerMethod4(AbstractAnalyzer):
@@ -58,10 +58,9 @@ class AnalyzerMethod4(AbstractAnalyzer):
                 element = driver.find_elements(by=By.XPATH, value=selected_elements[0].x_path)[0]
                 identifier_or_none = XPath(calculate_xpath(element, driver))
             elif len(selected_elements) > 1:
-                xpaths = []
-                for element in selected_elements:
-                    current_element = driver.find_elements(by=By.XPATH, value=element.x_path)[0]
-                    xpaths.append(calculate_xpath(current_element, driver))
+                elements = [driver.find_elements(by=By.XPATH, value=element.x_path)[0] for element in selected_elements]
+                # Calculate all XPaths in one script execution instead of a driver round-trip per element
+                xpaths = calculate_xpaths(elements, driver)
                 identifier_or_none = XPath(calculate_common_xpath(xpaths))
         if identifier_or_none.x_path == "//":
             identifier_or_none = None
@@ -1,5 +1,6 @@
 """File containing the HTMLClass class."""
-from typing import List
+import functools
+from typing import Iterator, List
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
@@ -10,6 +11,28 @@ from bs4 import BeautifulSoup
 from bs4.element import ResultSet
 
 
+@functools.lru_cache(maxsize=8)
+def _parse_html(html: str) -> BeautifulSoup:
+    """Parse `html`, reusing the result when several identifiers are evaluated on the same page."""
+    return BeautifulSoup(html, 'lxml')
+
+
+def _css_class_selector(html_class: str) -> str:
+    """Convert an HTML class, or a space separated group of classes, into an escaped CSS class selector."""
+    selector = ''
+    for name in html_class.split():
+        selector += '.'
+        for index, char in enumerate(name):
+            if char.isdigit() and (index == 0 or (index == 1 and name[0] == '-')):
+                # Identifiers cannot start with a digit, so it is escaped by its code point
+                selector += f'\\3{char} '
+            elif char.isalnum() or char in '-_' or ord(char) >= 0x80:
+                selector += char
+            else:
+                selector += '\\' + char
+    return selector
+
+
 class HTMLClass(ResourceIdentifier):
     """Class for HTML class resource identifiers.
 
@@ -24,6 +47,8 @@ class HTMLClass(ResourceIdentifier):
         If this is not applicable, it has value None.
     """
 
+    __slots__ = ('html_classes', '_single_classes', '_compound_classes', '_css_selector')
+
     def __init__(self, html_classes: List[str], date_format=None):
         """Initialize an HTML class resource identifier.
 
@@ -41,6 +66,12 @@ class HTMLClass(ResourceIdentifier):
         if len(html_classes) == 0:
             raise ValueError("html_classes should be a non-empty list")
         self.html_classes = html_classes
+        # Compiled once, both lookups are performed for every page the identifier is applied to. An entry with several
+        # classes, e.g. "post content", matches tags that have all of them, like the CSS selector does.
+        class_groups = [frozenset(html_class.split()) for html_class in html_classes]
+        self._single_classes = frozenset(class_name for group in class_groups if len(group) == 1 for class_name in group)
+        self._compound_classes = tuple(group for group in class_groups if len(group) > 1)
+        self._css_selector = ','.join(_css_class_selector(html_class) for html_class in html_classes)
 
     def get_elements(self, html: str) -> List[str]:
         """The HTML elements that are identified by this ResourceIdentifier.
@@ -57,11 +88,15 @@ class HTMLClass(ResourceIdentifier):
         list of str
             A possibly empty list of HTML elements that match this ResourceIdentifier.
         """
-        result_set = self._get_elements_raw(html)
-        return [str(tag) for tag in result_set]
+        return list(self.iter_elements(html))
+
+    def iter_elements(self, html: str) -> Iterator[str]:
+        for tag in self._get_elements_raw(html):
+            yield str(tag)
 
     def get_selenium_elements(self, driver: TorBrowserDriver) -> List[WebElement]:
-        return driver.find_elements(By.XPATH, self.x_path)
+        # Match any of the classes with a CSS selector, which browsers evaluate faster than an equivalent XPath
+        return driver.find_elements(By.CSS_SELECTOR, self._css_selector)
 
     def _get_elements_raw(self, html) -> ResultSet:
         """The HTML elements that are identified by this ResourceIdentifier.
@@ -78,8 +113,21 @@ class HTMLClass(ResourceIdentifier):
         ResultSet
             BeautifulSoup tags that match this ResourceIdentifier.
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        return soup.find_all(None, {'class': self.html_classes})
+        soup = _parse_html(html)
+        return soup.find_all(self._matches)
+
+    def _matches(self, tag) -> bool:
+        """Whether `tag` has one of the HTML classes of this ResourceIdentifier."""
+        tag_classes = tag.get('class')
+        if not tag_classes:
+            return False
+        # Sets turn the per-tag class test into hash lookups instead of scanning html_classes for every class
+        if not self._single_classes.isdisjoint(tag_classes):
+            return True
+        if self._compound_classes:
+            tag_classes = set(tag_classes)
+            return any(group <= tag_classes for group in self._compound_classes)
+        return False
 
     def get_number_of_elements(self, html: str) -> int:
         """The number of HTML elements that are identified by this ResourceIdentifier.
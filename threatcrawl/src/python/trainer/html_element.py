@@ -2,7 +2,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class HTMLElement:
     """Class representing an HTML element by its outer HTML, and its XPath which locates
     it in the web page the elements originates from."""
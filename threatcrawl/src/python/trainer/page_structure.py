@@ -6,7 +6,7 @@ from trainer.resource_identifier import ResourceIdentifier
 from typing import Dict
 
 
-@dataclass
+@dataclass(slots=True)
 class PageStructure:
     """Class containing the structure of a web page.
 
@@ -3,7 +3,7 @@ from abc import abstractmethod
 # from enums.navigational_element import NavigationalElement
 # from enums.input_element import InputElement
 # from enums.data_element import DataElement
-from typing import List
+from typing import Iterator, List
 
 from tbselenium.tbdriver import TorBrowserDriver
 
@@ -20,6 +20,8 @@ class ResourceIdentifier(DataContainer):
         If this is not applicable, it has value None.
     """
 
+    __slots__ = ('date_format',)
+
     @abstractmethod
     def __init__(self, date_format=None):
         """The abstract class cannot be instantiated."""
@@ -43,6 +45,24 @@ class ResourceIdentifier(DataContainer):
         """
         pass
 
+    def iter_elements(self, html: str) -> Iterator[str]:
+        """Iterate over the HTML elements that are identified by this ResourceIdentifier.
+
+        Unlike `get_elements`, implementations may serialize the elements one at a time, so the outer HTML of all
+        matches is never held in memory at once.
+
+        Parameters
+        ----------
+        html : str
+            The HTML in which HTML elements are identified.
+
+        Yields
+        ------
+        str
+            The HTML elements that match this ResourceIdentifier.
+        """
+        yield from self.get_elements(html)
+
     @abstractmethod
     def get_selenium_elements(self, driver: TorBrowserDriver):
         """The HTML elements that are identified by this ResourceIdentifier.
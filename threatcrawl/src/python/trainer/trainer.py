@@ -3,8 +3,10 @@ from collections import Counter
 from time import sleep
 
 import pymsgbox
-from selenium.common.exceptions import InvalidSelectorException
+from selenium.common.exceptions import InvalidSelectorException, JavascriptException, \
+    StaleElementReferenceException, TimeoutException
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
 from tbselenium.tbdriver import TorBrowserDriver
 
 from trainer.analyzer_method1 import AnalyzerMethod1
@@ -21,11 +23,23 @@ from enums import NavigationalElement, DataElement, InputElement, PageType
 from database.util import to_json
 from trainer.xpath_injector import XPathInjector
 from utils import Logger
+from utils.serialization import dumps, loads
 import websockets
 import asyncio
-import json
+import dataclasses
+import functools
 from enum import Enum
 
+# Every structural element, in the order the method identifiers map is populated
+_ALL_STRUCTURAL_ELEMENTS = (*NavigationalElement, *DataElement, *InputElement)
+
+# Seconds to let JavaScript from the user start its effects (e.g. a navigation) before waiting for the page to load
+_JAVASCRIPT_SETTLE_TIME = 2
+# Seconds between two checks of whether the page has finished loading and rendering
+_JAVASCRIPT_POLL_INTERVAL = 0.5
+# Upper bound in seconds on waiting for the page to load after executing JavaScript from the user
+_JAVASCRIPT_LOAD_TIMEOUT = 10
+
 
 class Trainer:
     """Trainer class for the trainer module.
@@ -39,7 +53,7 @@ class Trainer:
         The GUI port number.
     """
 
-    def __init__(self, data_api, gui_port = 8080, driver: TorBrowserDriver = None, had_issues = [],
+    def __init__(self, data_api, gui_port = 8080, driver: TorBrowserDriver = None, had_issues = None,
                  method_identifiers_map = None):
         """Initialize the Trainer.
 
@@ -59,15 +73,15 @@ class Trainer:
         self.gui_port = gui_port
         self.driver = driver
 
-        # Analyzer methods in order of preference
-        self.analyzer_methods = [AnalyzerMethod3(), AnalyzerMethod2(),
-                                 AnalyzerMethod1(), AnalyzerMethod4(), XPathInjector()]
-        self.had_issues = had_issues
+        # Analyzer methods in order of preference, only instantiated once they are needed
+        self.analyzer_method_types = (AnalyzerMethod3, AnalyzerMethod2, AnalyzerMethod1, AnalyzerMethod4, XPathInjector)
+        self._analyzer_methods = {}
+        # Structural elements that need to be retrained, a set because it is mostly used for membership checks
+        self.had_issues = set(had_issues) if had_issues is not None else set()
         self.tried_selenium = False
         self.first_time_in_session = False
         self.first_time_asked = True
         self.iteration_count = 0
-        self.had_issues = had_issues
 
     def train(self, page, page_type=None, javascript: str = ''):
         """Train the crawler on a web page.
@@ -93,16 +107,15 @@ class Trainer:
             The trained PageStructure for the provided `page`.
         """
         # Get platform url, e.g. https://canvas.tue.nl/courses/14813 becomes canvas.tue.nl
-        platform_url = get_tld(page.url, as_object=True).parsed_url.netloc
+        platform_url = _get_platform_url(page.url)
 
         # Get page data from database
         page_data = self.get_page_data_from_database(page.url)
         page_data['file_contents'] = page.html
         # Perform training session, this includes all communication with the GUI
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            trained_page_structure = asyncio.get_event_loop().run_until_complete(
+            # asyncio.run closes the event loop again, also when the training session raises
+            trained_page_structure = asyncio.run(
                 self.perform_training_session(platform_url, page_data, page_type, javascript=javascript))
         except ConnectionRefusedError as e:
             raise ConnectionRefusedError(f"No connection could be made with the websocket of the GUI at port "
@@ -155,16 +168,16 @@ class Trainer:
             if self.method_identifiers_map[k] != 0 and keep_same_method:
                 if len(prev_identifiers[k]) != 0 and identified_elements[k] == 0:
                     identifiers[k] = prev_identifiers[k][0]
-                else:
-                    for i, method in enumerate(self.analyzer_methods):
-                        if self.method_identifiers_map[k] == i+1:
-                            ignored = ignored_elements.get(k, [])
-                            identifier_or_none = method.construct_identifier(page_html, v, ignored, k, driver=self.driver)
-                            if identifier_or_none is None:
-                                identifiers[k] = prev_identifiers[k][0]
-                            else:
-                                identifiers[k] = identifier_or_none
-                            break
+                elif 0 < self.method_identifiers_map[k] <= len(self.analyzer_method_types):
+                    # The map stores the 1-based position of the method that was used before
+                    i = self.method_identifiers_map[k] - 1
+                    ignored = ignored_elements.get(k, [])
+                    identifier_or_none = self.get_analyzer_method(i).construct_identifier(page_html, v, ignored, k,
+                                                                                          driver=self.driver)
+                    if identifier_or_none is None:
+                        identifiers[k] = prev_identifiers[k][0]
+                    else:
+                        identifiers[k] = identifier_or_none
             # Regular iterative construction of identifiers
             else:
                 if len(prev_identifiers[k]) != 0:
@@ -175,16 +188,17 @@ class Trainer:
                 elif len(v) != 0:
                     found = False
                     ignored = ignored_elements.get(k, [])
-                    for i, method in enumerate(self.analyzer_methods):
+                    for i in range(len(self.analyzer_method_types)):
                         try:
-                            if i != len(self.analyzer_methods) - 1:
+                            if i != len(self.analyzer_method_types) - 1:
                                 if self.method_identifiers_map[k] > i:
                                     continue
                         except KeyError:
                             # That key wasn't here yet. Let's add it
                             self.method_identifiers_map[k] = 0
                         self.method_identifiers_map[k] = i+1
-                        identifier_or_none = method.construct_identifier(page_html, v, ignored, k, driver=self.driver)
+                        identifier_or_none = self.get_analyzer_method(i).construct_identifier(page_html, v, ignored,
+                                                                                              k, driver=self.driver)
                         # If the method yielded something (hence it was a result shown before) but it is not the
                         # one desired, then keep on going with the next method.
                         if identifier_or_none is not None:
@@ -200,6 +214,46 @@ class Trainer:
                     identifiers[k] = None
         return identifiers
 
+    def get_analyzer_method(self, index):
+        """Get the analyzer method at position `index` in the order of preference, instantiating it on first use.
+
+        Parameters
+        ----------
+        index : int
+            The position of the analyzer method in `analyzer_method_types`.
+
+        Returns
+        -------
+        AbstractAnalyzer
+            The instance of the analyzer method.
+        """
+        if index not in self._analyzer_methods:
+            self._analyzer_methods[index] = self.analyzer_method_types[index]()
+        return self._analyzer_methods[index]
+
+    def wait_until_page_loaded(self):
+        """Wait until the page in the driver has finished loading, e.g. after executing JavaScript on it.
+
+        Besides waiting for the document to be loaded, this waits until the DOM stops changing, since pages that
+        render their content with scripts (e.g. after an XHR request) are already complete before that. If the page
+        is not settled within `_JAVASCRIPT_LOAD_TIMEOUT` seconds, training continues with the page as is.
+        """
+        sleep(_JAVASCRIPT_SETTLE_TIME)
+        # Scripts fail or elements go stale while a navigation is in progress, which just means it is not done yet
+        wait = WebDriverWait(self.driver, _JAVASCRIPT_LOAD_TIMEOUT, poll_frequency=_JAVASCRIPT_POLL_INTERVAL,
+                             ignored_exceptions=(JavascriptException, StaleElementReferenceException))
+        dom_sizes = []
+
+        def dom_is_stable(driver):
+            dom_sizes.append(driver.execute_script("return document.documentElement.outerHTML.length"))
+            return len(dom_sizes) > 1 and dom_sizes[-1] == dom_sizes[-2]
+
+        try:
+            wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+            wait.until(dom_is_stable)
+        except TimeoutException:
+            Logger.log("trainer", "Page did not finish loading after executing JavaScript, continuing anyway")
+
     async def perform_training_session(self, platform_url, page_data, page_type, javascript: str = ''):
         """Perform a training session on a web page.
 
@@ -275,15 +329,17 @@ class Trainer:
         Logger.log("trainer", "Received user input")
         identifiers = None
         while response != 'structure is correct':
-            if json.loads(response)['javascript'] != '':
-                javascript = json.loads(response)['javascript']
+            # Parse once, the message is either JavaScript to execute or the user input to convert
+            message = loads(response)
+            if message['javascript'] != '':
+                javascript = message['javascript']
                 # I'm executing JS and communicating that this was not yet a training, hence go back to the main
                 # training sequence to download again the page after executing JS
                 self.driver.execute_script(javascript)
-                sleep(5)
+                self.wait_until_page_loaded()
                 return javascript
             else:
-                dct = json.loads(response, object_hook=user_input_json_decoder)
+                dct = user_input_json_decoder(message)
                 self.verify_and_populate_method_identifiers_map(dct)
                 identifiers, compatible_identifiers = self.create_and_identify_selectors(dct, page_html)
             # if iteration_count > 0:
@@ -302,10 +358,10 @@ class Trainer:
             #                 self.method_identifiers_map[key] = self.method_identifiers_map[key] + 1
             #                 self.had_issues.append(key)
             #         identifiers, compatible_identifiers = self.create_and_identify_selectors(dct, page_html)
-            await websocket.send(json.dumps({
+            await websocket.send(dumps({
                 'action': 'doublecheck',
                 'data': compatible_identifiers
-            }, cls=CustomJSONEncoder))
+            }, default=_encode_identifier))
             Logger.log("trainer", "Sent constructed identifiers")
 
             # Get response from GUI
@@ -317,32 +373,29 @@ class Trainer:
         return PageStructure(dct['page_type'], identifiers, javascript_previous)
 
     def verify_and_populate_method_identifiers_map(self, dct):
-        if self.method_identifiers_map is not {}:
-            if self.method_identifiers_map == {}:
-                for navigational_item in NavigationalElement:
-                    self.method_identifiers_map[navigational_item] = 0
-                for data_element in DataElement:
-                    self.method_identifiers_map[data_element] = 0
-                for input_element in InputElement:
-                    self.method_identifiers_map[input_element] = 0
+        if not self.method_identifiers_map:
+            # Updated in place, the map may be shared with the interpreter
+            self.method_identifiers_map.update(dict.fromkeys(_ALL_STRUCTURAL_ELEMENTS, 0))
 
     def create_and_identify_selectors(self, dct, page_html):
-        selected_elements = {k: v[0] for k, v in dct['structural_elements'].items()}
-        ignored_elements = {k: v[1] for k, v in dct['structural_elements'].items()}
-        prev_identifiers = {k: v[2] for k, v in dct['structural_elements'].items()}
+        selected_elements, ignored_elements, prev_identifiers = {}, {}, {}
+        for k, v in dct['structural_elements'].items():
+            selected_elements[k] = v[0]
+            ignored_elements[k] = v[1]
+            prev_identifiers[k] = v[2]
         # no_longer_visible_elements = []
         # Meaning: is it the first time we train that page (and therefore we have nothing to compare with yet)?
-        has_prev_identifiers = False
-        for k, v in prev_identifiers.items():
-            if len(v) > 0:
-                has_prev_identifiers = True
-                break
-
-        if not has_prev_identifiers:
-            for k, v in self.method_identifiers_map.items():
-                if v != 0:
-                    has_prev_identifiers = True
-                    break
+        has_prev_identifiers = (any(len(v) > 0 for v in prev_identifiers.values())
+                                or any(v != 0 for v in self.method_identifiers_map.values()))
+
+        # The page does not change while the selectors are compared, so every XPath only needs one browser query
+        found_elements = {}
+
+        def find_elements(x_path):
+            if x_path not in found_elements:
+                found_elements[x_path] = self.driver.find_elements(By.XPATH, x_path)
+            # Return a copy, the caller may remove elements from it
+            return list(found_elements[x_path])
 
         if has_prev_identifiers:
             keys = selected_elements.keys()
@@ -354,38 +407,39 @@ class Trainer:
                     no_prev_id = True
                 elif len(prev_identifiers[k]) == 0:
                     no_prev_id = True
-                if no_prev_id and self.method_identifiers_map[k] != 0:
-                    for i, method in enumerate(self.analyzer_methods):
-                        if self.method_identifiers_map[k] == i + 1:
-                            ignored = ignored_elements.get(k, [])
-                            v = selected_elements.get(k)
-                            identifier_or_none = method.construct_identifier(page_html, v, ignored, k, driver=self.driver)
-                            if identifier_or_none is not None:
-                                if not isinstance(identifier_or_none, list):
-                                    identifier_or_none = [identifier_or_none]
-                                prev_identifiers[k] = identifier_or_none
-                            break
+                if no_prev_id and 0 < self.method_identifiers_map[k] <= len(self.analyzer_method_types):
+                    method = self.get_analyzer_method(self.method_identifiers_map[k] - 1)
+                    ignored = ignored_elements.get(k, [])
+                    v = selected_elements.get(k)
+                    identifier_or_none = method.construct_identifier(page_html, v, ignored, k, driver=self.driver)
+                    if identifier_or_none is not None:
+                        if not isinstance(identifier_or_none, list):
+                            identifier_or_none = [identifier_or_none]
+                        prev_identifiers[k] = identifier_or_none
 
                 if len(prev_identifiers[k]) != 0:
                     if isinstance(prev_identifiers[k][0], XPathExcept):
-                        prev_elements = self.driver.find_elements(By.XPATH, prev_identifiers[k][0].x_path_use.x_path)
-                        remove = prev_identifiers[k][0].x_path_remove.x_path
-                        for remove_elem in remove.split(" | "):
-                            try:
-                                prev_elements.remove(self.driver.find_elements(By.XPATH, remove_elem)[0])
-                            except ValueError:
-                                continue
+                        prev_elements = find_elements(prev_identifiers[k][0].x_path_use.x_path)
+                        # The remove XPath is already a union, so a single query returns everything it excludes
+                        removed_elements = set(find_elements(prev_identifiers[k][0].x_path_remove.x_path))
+                        prev_elements = [elem for elem in prev_elements if elem not in removed_elements]
                     else:
                         try:
-                            prev_elements = self.driver.find_elements(By.XPATH, prev_identifiers[k][0].x_path)
+                            prev_elements = find_elements(prev_identifiers[k][0].x_path)
                         except InvalidSelectorException:
                             prev_elements = []
                         # if len(prev_elements) == 0:
                         #     no_longer_visible_elements.append(prev_identifiers[k][0].x_path)
                     curr_elements = []
-                    for elem in selected_elements[k]:
-                        curr_elements = curr_elements + self.driver.find_elements(By.XPATH, elem.x_path)
-                    if Counter(prev_elements) != Counter(curr_elements):
+                    if len(selected_elements[k]) != 0:
+                        try:
+                            # A single query for the union of the selected XPaths, instead of one query per element
+                            curr_elements = find_elements(" | ".join(elem.x_path for elem in selected_elements[k]))
+                        except InvalidSelectorException:
+                            for elem in selected_elements[k]:
+                                curr_elements.extend(find_elements(elem.x_path))
+                    # Comparing lengths first avoids hashing every element when the selection size changed
+                    if len(prev_elements) != len(curr_elements) or Counter(prev_elements) != Counter(curr_elements):
                         # if self.first_time_asked:
                         #     answer = pymsgbox.confirm('Is this the first time you\'re training on this page during '
                         #                               'this session?', 'Check', ['Yes', 'No'])
@@ -401,7 +455,7 @@ class Trainer:
                                                   'element in this page/you did nothing?', 'Check',
                                                   [k.name + ' problem by THREAT/crawl', 'Ignore'])
                         if answer != 'Ignore':
-                            self.had_issues.append(k)
+                            self.had_issues.add(k)
 
         # We're training for the first time this page (so we have no previous identifiers as reference),
         # and we're adjusting it, or it has been reset during its lifecycle and we're adjusting it.
@@ -415,34 +469,42 @@ class Trainer:
                     'element in this page/you did nothing?', 'Check',
                     [k.name + ' problem by THREAT/crawl', 'Ignore'])
                 if answer != 'Ignore':
-                    self.had_issues.append(k)
+                    self.had_issues.add(k)
 
         # Did we have any issue so far? By issues, I mean the scenario in which training was ok, but after refreshing
         # the page THREAT/crawl could not identify again the elements (identifier changed). In this scenario, I keep trace of
         # what elements had problems, and I can ask the trainer to use another method.
         if len(self.had_issues) != 0:
-            retrain_selected_elements = {k: v[0] for k, v in dct['structural_elements'].items() if k in self.had_issues}
-            retrain_ignored_elements = {k: v[1] for k, v in dct['structural_elements'].items() if k in self.had_issues}
-            retrain_prev_identifiers = {k: v[2] for k, v in dct['structural_elements'].items() if k in self.had_issues}
+            # Split the structural elements into those to retrain and the others in a single pass
+            retrain_selected_elements, retrain_ignored_elements, retrain_prev_identifiers = {}, {}, {}
+            non_retrained_selected_elements, non_retrained_ignored_elements, non_retrained_prev_identifiers = {}, {}, {}
+            for k, v in dct['structural_elements'].items():
+                if k in self.had_issues:
+                    retrain_selected_elements[k] = v[0]
+                    retrain_ignored_elements[k] = v[1]
+                    retrain_prev_identifiers[k] = v[2]
+                else:
+                    non_retrained_selected_elements[k] = v[0]
+                    non_retrained_ignored_elements[k] = v[1]
+                    non_retrained_prev_identifiers[k] = v[2]
             keys = retrain_prev_identifiers.keys()
             for key in keys:
                 # If an element had issues, was previously identified but now there's no more, I'll remove it completely
                 if len(retrain_selected_elements[key]) == 0:
                     retrain_prev_identifiers[key] = []
-            retrained_identifiers = self.construct_identifiers_for_page(
-                page_html, retrain_selected_elements, retrain_ignored_elements, retrain_prev_identifiers)
-            for key in keys:
-                if retrained_identifiers[key] is None:
-                    retrained_identifiers.pop(key)
-            non_retrained_selected_elements = {k: v[0] for k, v in dct['structural_elements'].items()
-                                               if k not in self.had_issues}
-            non_retrained_ignored_elements = {k: v[1] for k, v in dct['structural_elements'].items()
-                                              if k not in self.had_issues}
-            non_retrained_prev_identifiers = {k: v[2] for k, v in dct['structural_elements'].items()
-                                              if k not in self.had_issues}
-            identifiers = self.construct_identifiers_for_page(
-                page_html, non_retrained_selected_elements, non_retrained_ignored_elements,
-                non_retrained_prev_identifiers, keep_same_method=True)
+            retrained_identifiers = {}
+            if retrain_selected_elements:
+                retrained_identifiers = self.construct_identifiers_for_page(
+                    page_html, retrain_selected_elements, retrain_ignored_elements, retrain_prev_identifiers)
+                for key in keys:
+                    if retrained_identifiers[key] is None:
+                        retrained_identifiers.pop(key)
+            identifiers = {}
+            # All structural elements may have had issues, then there is nothing left to construct as before
+            if non_retrained_selected_elements:
+                identifiers = self.construct_identifiers_for_page(
+                    page_html, non_retrained_selected_elements, non_retrained_ignored_elements,
+                    non_retrained_prev_identifiers, keep_same_method=True)
             identifiers = {**identifiers, **retrained_identifiers}
         else:
             # Construct resource identifiers for selected elements, and send it to the GUI
@@ -488,11 +550,13 @@ class Trainer:
         str
             String of the JSON representation of `page_structure`.
         """
-        structure_dict = page_structure.__dict__
-        json_dict = structure_dict.copy()
+        json_dict = {field.name: getattr(page_structure, field.name) for field in dataclasses.fields(page_structure)}
         json_dict['identifiers'] = _make_identifiers_json_compatible(json_dict['identifiers'])
+        # Enums are converted explicitly, since orjson would serialize them by value instead of by name
+        if isinstance(json_dict['page_type'], Enum):
+            json_dict['page_type'] = json_dict['page_type'].name
 
-        return json.dumps(json_dict, cls=CustomJSONEncoder)
+        return dumps(json_dict, default=_encode_identifier)
 
     def get_page_structure_from_database(self, platform_url, page_type):
         """Get the identifiers of a given page type on a platform from the database.
@@ -592,21 +656,13 @@ class Trainer:
         inserted_info = {'platform_url': platform_url, 'page_type': page_type}
         page_structure_dict = {}
         for structural_element, identifier in identifiers.items():
-            page_structure = {'date_format': identifier.date_format}
-            if isinstance(identifier, XPath):
-                page_structure['identifier_type'] = "XPath"
-                page_structure['identifier'] = identifier.x_path
-            elif isinstance(identifier, HTMLClass):
-                page_structure['identifier_type'] = "HTMLClass"
-                page_structure['identifier'] = identifier.html_classes
-            elif isinstance(identifier, XPathExcept):
-                page_structure['identifier_type'] = "XPathExcept"
-                xpath_except_identifier = {}
-                xpath_except_identifier['x_path_use'] = identifier.x_path_use.x_path
-                xpath_except_identifier['x_path_remove'] = identifier.x_path_remove.x_path
-                page_structure['identifier'] = xpath_except_identifier
-            else:
+            try:
+                encoder = _IDENTIFIER_ENCODERS[type(identifier)]
+            except KeyError:
                 raise RuntimeError("Unknown type of resource identifier: " + str(type(identifier)))
+            identifier_type, identifier_data = encoder(identifier)
+            page_structure = {'date_format': identifier.date_format, 'identifier_type': identifier_type,
+                              'identifier': identifier_data}
             page_structure_dict[structural_element.name] = page_structure
         inserted_info['structural_elements'] = page_structure_dict
 
@@ -615,7 +671,12 @@ class Trainer:
         else:
             inserted_info['javascript'] = javascript
 
-        if len(self.get_identifiers_from_database(platform_url, page_type)) == 0:
+        query = {
+            'platform_url': platform_url,
+            'page_type': page_type,
+        }
+        # Only the existence of the document matters here, so it is counted instead of loading its identifiers
+        if self.data_api['resource identifier'].count_documents(query).exec() == 0:
             self.data_api['resource identifier'].insert(inserted_info).exec()
         else:
             self.data_api['resource identifier'].update({
@@ -624,19 +685,49 @@ class Trainer:
             }, {'$set': inserted_info}).exec()
 
 
-class CustomJSONEncoder(json.JSONEncoder):
-    """Implementation of JSONEncoder for converting objects into a JSON-compatible representation."""
+# Per type of resource identifier, a function returning its type name and its JSON-compatible data
+_IDENTIFIER_ENCODERS = {
+    XPath: lambda identifier: ("XPath", identifier.x_path),
+    HTMLClass: lambda identifier: ("HTMLClass", identifier.html_classes),
+    XPathExcept: lambda identifier: ("XPathExcept", {'x_path_use': identifier.x_path_use.x_path,
+                                                     'x_path_remove': identifier.x_path_remove.x_path}),
+}
+
+
+def _encode_identifier(obj):
+    """Convert an object that is not supported by JSON into a JSON-compatible representation.
+
+    Parameters
+    ----------
+    obj : any
+        The object to convert, e.g. a ResourceIdentifier.
+
+    Returns
+    -------
+    str or dict
+        The JSON-compatible representation of `obj`.
+
+    Raises
+    ------
+    TypeError
+        If `obj` cannot be converted.
+    """
+    encoder = _IDENTIFIER_ENCODERS.get(type(obj))
+    if encoder is not None:
+        identifier_type, identifier_data = encoder(obj)
+        return {identifier_type: identifier_data}
+    if isinstance(obj, Enum):
+        return obj.name
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 
-    def default(self, obj):
-        if isinstance(obj, Enum):
-            return obj.name
-        if isinstance(obj, HTMLClass):
-            return {'HTMLClass': obj.html_classes}
-        if isinstance(obj, XPath):
-            return {'XPath': obj.x_path}
-        if isinstance(obj, XPathExcept):
-            return {'XPathExcept': {'x_path_use': obj.x_path_use.x_path, 'x_path_remove': obj.x_path_remove.x_path}}
-        return json.JSONEncoder.default(self, obj)
+# Per type name of resource identifier, a function constructing the identifier from its JSON-compatible data
+_PREV_IDENTIFIER_DECODERS = {
+    'XPath': lambda identifier_data: XPath(identifier_data),
+    'XPathExcept': lambda identifier_data: XPathExcept(XPath(identifier_data['x_path_use']),
+                                                       XPath(identifier_data['x_path_remove'])),
+    'HTMLClass': lambda identifier_data: HTMLClass(identifier_data),
+}
 
 
 def user_input_json_decoder(dct):
@@ -684,29 +775,23 @@ def user_input_json_decoder(dct):
                 continue
 
             # Otherwise convert every selected element into a HTMLElement object
-            selected_html_elmnts = []
-            for selected_html_elmnt_dct in selected_html_elmnt_dcts:
-                html_element = HTMLElement(selected_html_elmnt_dct['outer_html'], selected_html_elmnt_dct['x_path'])
-                selected_html_elmnts.append(html_element)
+            selected_html_elmnts = [HTMLElement(selected_html_elmnt_dct['outer_html'],
+                                                selected_html_elmnt_dct['x_path'])
+                                    for selected_html_elmnt_dct in selected_html_elmnt_dcts]
 
             # Convert ignored elements into HTMLElement objects
-            ignored_html_elmnts = []
-            if 'ignored_elements' in value_dct:
-                ignored_html_elmnt_dcts = value_dct['ignored_elements']
-                for ignored_html_elmnt_dct in ignored_html_elmnt_dcts:
-                    html_element = HTMLElement(ignored_html_elmnt_dct['outer_html'], ignored_html_elmnt_dct['x_path'])
-                    ignored_html_elmnts.append(html_element)
+            ignored_html_elmnts = [HTMLElement(ignored_html_elmnt_dct['outer_html'], ignored_html_elmnt_dct['x_path'])
+                                   for ignored_html_elmnt_dct in value_dct.get('ignored_elements', ())]
 
             prev_identifiers = []
             if prev_identifier_lst:
-                key = next(iter(prev_identifier_lst[0]))
-                if key == 'XPath':
-                    prev_identifiers.append(XPath(prev_identifier_lst[0][key]))
-                elif key == 'XPathExcept':
-                    prev_identifiers.append(XPathExcept(XPath(prev_identifier_lst[0][key]['x_path_use']),
-                                                        XPath(prev_identifier_lst[0][key]['x_path_remove'])))
-                elif key == 'HTMLClass':
-                    prev_identifiers.append(HTMLClass(prev_identifier_lst[0][key]))
+                # The previous identifier is sent as encoded by `_encode_identifier`, with its type as the only key
+                (identifier_type, identifier_data), = prev_identifier_lst[0].items()
+                try:
+                    decoder = _PREV_IDENTIFIER_DECODERS[identifier_type]
+                except KeyError:
+                    raise KeyError("Unknown type of previous resource identifier: " + identifier_type)
+                prev_identifiers.append(decoder(identifier_data))
 
             # Handle date format
             date_format = None
@@ -761,12 +846,30 @@ def _make_identifiers_json_compatible(identifiers):
 
     Returns
     -------
-    dict<key: str, value: ResourceIdentifier>
-        A dictionary where all StructuralElement keys are substituted by its string name.
+    dict<key: str, value: dict>
+        A dictionary where all StructuralElement keys are substituted by its string name, and the ResourceIdentifier
+        values by their JSON-compatible representation, so no custom encoding is needed afterwards.
     """
 
     new_dict = {}
     for k, v in identifiers.items():
         if v is not None:
-            new_dict[k.name] = {'identifier': v, 'date_format': v.date_format}
+            new_dict[k.name] = {'identifier': _encode_identifier(v), 'date_format': v.date_format}
     return new_dict
+
+
+@functools.lru_cache(maxsize=256)
+def _get_platform_url(page_url):
+    """Get the network location of `page_url`, e.g. https://canvas.tue.nl/courses/14813 becomes canvas.tue.nl.
+
+    Parameters
+    ----------
+    page_url : str
+        The URL of a page of the platform.
+
+    Returns
+    -------
+    str
+        The network location of the platform.
+    """
+    return get_tld(page_url, as_object=True).parsed_url.netloc
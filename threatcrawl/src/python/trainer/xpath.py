@@ -1,5 +1,6 @@
 """File containing the XPath class."""
-from typing import List
+import functools
+from typing import Iterator, List, Optional
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
@@ -11,6 +12,45 @@ from lxml.etree import tostring, Element
 from utils import Logger
 
 
+def parse_html(html: str) -> Optional[Element]:
+    """Parse `html` into an lxml tree.
+
+    Parameters
+    ----------
+    html : str
+        The HTML to parse.
+
+    Returns
+    -------
+    Element or None
+        The root element of the parsed HTML, or None if parsing did not succeed.
+    """
+    html_obj = etree.HTML(html)
+    if html_obj is None:
+        Logger.log("trainer", "Parsing did not succeed! The HTML for which it failed is {}".format(html))
+    return html_obj
+
+
+@functools.lru_cache(maxsize=512)
+def compile_xpath(x_path: str) -> etree.XPath:
+    """Compile `x_path` into an lxml XPath evaluator.
+
+    The same identifiers are evaluated on many pages, so equal XPaths share a single compiled evaluator instead of
+    being compiled again for every evaluation.
+
+    Parameters
+    ----------
+    x_path : str
+        String representation of the XPath.
+
+    Returns
+    -------
+    etree.XPath
+        The compiled XPath, which is called with the element to evaluate it on.
+    """
+    return etree.XPath(x_path)
+
+
 class XPath(ResourceIdentifier):
     """Class for XPath resource identifiers.
 
@@ -26,6 +66,8 @@ class XPath(ResourceIdentifier):
         If this is not applicable, it has value None.
     """
 
+    __slots__ = ('x_path',)
+
     def __init__(self, x_path: str, date_format=None):
         """Initialize an XPath resource identifier.
 
@@ -54,9 +96,11 @@ class XPath(ResourceIdentifier):
         list of str
             A possibly empty list of HTML elements that match this ResourceIdentifier.
         """
-        html_etree = self._get_elements_raw(html)
-        html_list = [tostring(s, method='html', encoding=str).strip('\n\r\t ') for s in html_etree]
-        return html_list
+        return list(self.iter_elements(html))
+
+    def iter_elements(self, html: str) -> Iterator[str]:
+        for element in self._get_elements_raw(html):
+            yield tostring(element, method='html', encoding='unicode').strip('\n\r\t ')
 
     def get_number_of_elements(self, html: str) -> int:
         """The number of HTML elements that are identified by this ResourceIdentifier.
@@ -87,14 +131,13 @@ class XPath(ResourceIdentifier):
             lxml elements that match this ResourceIdentifier.
         """
         # Convert str into html object
-        html_obj = etree.HTML(html)
+        html_obj = parse_html(html)
 
         if html_obj is None:
-            Logger.log("trainer", "Parsing did not succeed! The HTML for which it failed is {}".format(html))
             return []
         else:
             # Get ElementUnicodeResult based on x_path
-            return html_obj.xpath(self.x_path)
+            return compile_xpath(self.x_path)(html_obj)
 
     def get_selenium_elements(self, driver: TorBrowserDriver) -> List[WebElement]:
         return driver.find_elements(By.XPATH, self.x_path)
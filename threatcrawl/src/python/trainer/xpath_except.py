@@ -1,14 +1,25 @@
 """File containing the XPath class."""
-from typing import List
+from typing import Iterator, List
 
+from selenium.common.exceptions import JavascriptException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 from tbselenium.tbdriver import TorBrowserDriver
 
-from trainer.xpath import XPath
+from lxml.etree import Element, tostring
+
+from trainer.xpath import XPath, compile_xpath, parse_html
 from trainer.resource_identifier import ResourceIdentifier
 
 
+# Evaluates both XPaths in the browser and returns the wanted elements that are not unwanted, in one round-trip
+_GET_SELENIUM_ELEMENTS_JS = (
+    "var q=function(x){var r=document.evaluate(x,document,null,XPathResult.ORDERED_NODE_SNAPSHOT_TYPE,null),e=[];"
+    "for(var i=0;i<r.snapshotLength;i++){e.push(r.snapshotItem(i))}return e};"
+    "var u=new Set(q(arguments[1]));return q(arguments[0]).filter(function(e){return !u.has(e)});"
+)
+
+
 class XPathExcept(ResourceIdentifier):
     """Class for XPath resource identifiers.
 
@@ -26,6 +37,8 @@ class XPathExcept(ResourceIdentifier):
         If this is not applicable, it has value None.
     """
 
+    __slots__ = ('x_path_use', 'x_path_remove')
+
     def __init__(self, x_path_use: XPath, x_path_remove: XPath, date_format=None):
         """Initialize an XPath resource identifier.
 
@@ -43,10 +56,50 @@ class XPathExcept(ResourceIdentifier):
         assert type(x_path_remove) == XPath
 
     def get_elements(self, html_str) -> List[str]:
-        wanted_elements = self.x_path_use.get_elements(html_str)
-        unwanted_elements = self.x_path_remove.get_elements(html_str)
+        return list(self.iter_elements(html_str))
+
+    def iter_elements(self, html: str) -> Iterator[str]:
+        # Unwanted elements are removed by identity on a single parse, so only the remaining elements are serialized
+        for element in self._get_elements_raw(html):
+            yield tostring(element, method='html', encoding='unicode').strip('\n\r\t ')
+
+    def get_number_of_elements(self, html: str) -> int:
+        """The number of HTML elements that are identified by this ResourceIdentifier.
+
+        Parameters
+        ----------
+        html : str
+            The HTML in which HTML elements are identified.
 
-        return list(set(wanted_elements) - set(unwanted_elements))
+        Returns
+        -------
+        int
+            The number of HTML elements that are identifier by this ResourceIdentifier.
+        """
+        return len(self._get_elements_raw(html))
+
+    def _get_elements_raw(self, html: str) -> List[Element]:
+        """The HTML elements that are identified by this ResourceIdentifier.
+
+        Both XPaths are evaluated on a single parse of `html`, and unwanted elements are removed by identity, so no
+        element has to be serialized.
+
+        Parameters
+        ----------
+        html : str
+            The HTML in which HTML elements are identified.
+
+        Returns
+        -------
+        list of Element
+            lxml elements that match `x_path_use` but not `x_path_remove`.
+        """
+        html_obj = parse_html(html)
+        if html_obj is None:
+            return []
+        unwanted_elements = set(compile_xpath(self.x_path_remove.x_path)(html_obj))
+        return [element for element in compile_xpath(self.x_path_use.x_path)(html_obj)
+                if element not in unwanted_elements]
 
     def to_database_format(self) -> dict:
         return {
@@ -54,13 +107,15 @@ class XPathExcept(ResourceIdentifier):
         }
 
     def get_selenium_elements(self, driver: TorBrowserDriver) -> List[WebElement]:
+        try:
+            return driver.execute_script(_GET_SELENIUM_ELEMENTS_JS, self.x_path_use.x_path, self.x_path_remove.x_path)
+        except JavascriptException:
+            # E.g. the XPath is not supported by document.evaluate, let the driver evaluate both XPaths instead
+            pass
         allowed_elements = driver.find_elements(By.XPATH, self.x_path_use.x_path)
         disallowed_elements = driver.find_elements(By.XPATH, self.x_path_remove.x_path)
-        disallowed_ids = []
-        for element in disallowed_elements:
-            disallowed_ids.append(element.id)
-        result = [x for x in allowed_elements if x.id not in disallowed_ids]
-        return result
+        disallowed_ids = {element.id for element in disallowed_elements}
+        return [x for x in allowed_elements if x.id not in disallowed_ids]
 
     def __repr__(self) -> str:
         return f"Use: {self.x_path_use}; Remove: {self.x_path_remove}"
@@ -1,7 +1,10 @@
 """File containing the xpath helper functions which is useful for analyzer method 2."""
 # from difflib import SequenceMatcher
 # import itertools
+import functools
+
 from lxml.html import document_fromstring
+from selenium.common.exceptions import JavascriptException
 from selenium.webdriver.remote.webelement import WebElement
 from tbselenium.tbdriver import TorBrowserDriver
 
@@ -9,6 +12,25 @@ from utils import Logger
 import typing as t
 
 
+@functools.lru_cache(maxsize=8)
+def _parse_document(html: str):
+    """Parse `html` into an lxml tree, reusing the result when several XPaths are verified on the same page.
+
+    The returned tree is shared between callers, so it must not be modified.
+
+    Parameters
+    ----------
+    html : str
+        HTML of the page.
+
+    Returns
+    -------
+    ElementTree
+        The tree of the parsed HTML.
+    """
+    return document_fromstring(html).getroottree()
+
+
 def calculate_common_xpath_of_pair(xpath_1: str, xpath_2: str) -> str:
     """Returns the common XPath string of a pair of XPaths.
 
@@ -24,9 +46,24 @@ def calculate_common_xpath_of_pair(xpath_1: str, xpath_2: str) -> str:
     result_xpath: str
         Common XPath for the given pair of XPaths.
     """
-    element1_splitted = xpath_1.split("/")
-    element2_splitted = xpath_2.split("/")
+    return "/".join(_common_segments(xpath_1.split("/"), xpath_2.split("/")))
+
 
+def _common_segments(element1_splitted: t.List[str], element2_splitted: t.List[str]) -> t.List[str]:
+    """Returns the common segments of a pair of XPaths that are split on "/".
+
+    Parameters
+    ----------
+    element1_splitted: list of str
+        The segments of an XPath to be compared with `element2_splitted`.
+    element2_splitted: list of str
+        The segments of an XPath to be compared with `element1_splitted`.
+
+    Return
+    ------
+    list of str
+        The segments of the common XPath for the given pair of XPaths.
+    """
     # Make the depths of two xpath are the same
     element1_splitted = element1_splitted[:len(element2_splitted)]
     element2_splitted = element2_splitted[:len(element1_splitted)]
@@ -37,16 +74,14 @@ def calculate_common_xpath_of_pair(xpath_1: str, xpath_2: str) -> str:
         if element1_splitted[index] == element2_splitted[index]:
             result_xpath_element.append(element1_splitted[index])
         else:
-            if "[" in element1_splitted[index]:
-                # The mismatch handled here is like:
-                # div[4] <---> div[22]
-                element1_splitted[index] = element1_splitted[index].split("[")[0]
-            if "[" in element2_splitted[index]:
-                element2_splitted[index] = element2_splitted[index].split("[")[0]
-            if element1_splitted[index] == element2_splitted[index]:
-                result_xpath_element.append(element1_splitted[index])
-    result_xpath = "/".join(map(str, result_xpath_element))
-    return result_xpath
+            # The mismatch handled here is like:
+            # div[4] <---> div[22]
+            # partition drops any predicate in a single scan; a regex for numeric indices would be slower and would
+            # keep other predicates, which then never match.
+            tag_name = element1_splitted[index].partition("[")[0]
+            if tag_name == element2_splitted[index].partition("[")[0]:
+                result_xpath_element.append(tag_name)
+    return result_xpath_element
 
 
 def calculate_common_xpath(x_paths: t.List[str]) -> str:
@@ -73,21 +108,20 @@ def calculate_common_xpath(x_paths: t.List[str]) -> str:
     if len(x_paths) == 0:
         raise RuntimeError("No XPaths were provided.")
 
-    working = x_paths.copy()
-    while len(working) > 1:
-        # We compare the first XPath, which we call the pivot, with all the others
-        pivot = working[0]
-        common_xpaths = set()
-        for x_path in working[1:]:
-            common_xpaths.add(calculate_common_xpath_of_pair(pivot, x_path))
-        working = list(common_xpaths)
-    if not working[0].startswith('/'):
-        return "//" + working[0]
+    # Fold the XPaths into their common segments in a single pass, without joining and splitting in between
+    common_segments = x_paths[0].split("/")
+    for x_path in x_paths[1:]:
+        common_segments = _common_segments(common_segments, x_path.split("/"))
+        if not common_segments:
+            break
+    common_xpath = "/".join(common_segments)
+    if not common_xpath.startswith('/'):
+        return "//" + common_xpath
     else:
-        return working[0]
+        return common_xpath
 
 
-def verify_common_x_path(common_path: str, prev_common_path: str, html: str) -> bool:
+def verify_common_x_path(common_path: str, prev_common_path: str, tree) -> bool:
     """ Verifies that the common XPath `common_path` gives the same results as the previously identified common XPath.
 
     Parameters
@@ -96,8 +130,8 @@ def verify_common_x_path(common_path: str, prev_common_path: str, html: str) ->
         String representation of the supposed common XPath.
     prev_common_path : str
         String representations of the previous common XPath.
-    html:
-        HTML of the page.
+    tree : ElementTree
+        The parsed HTML of the page, so that several XPaths can be verified on a single parse.
 
     Returns
     -------
@@ -105,19 +139,39 @@ def verify_common_x_path(common_path: str, prev_common_path: str, html: str) ->
         If the number of identified elements using both XPaths is the same.
     """
 
-    # Verify that only the supplied XPaths are returned and not more
-    doc = document_fromstring(html)
-    tree = doc.getroottree()
-    results = tree.findall(common_path)
-    prev_results = tree.findall(prev_common_path)
+    # Verify that only the supplied XPaths are returned and not more. Only the numbers of results are compared, so
+    # the results are counted without collecting them in a list.
+    number_of_results = sum(1 for _ in tree.iterfind(common_path))
+    number_of_prev_results = sum(1 for _ in tree.iterfind(prev_common_path))
 
-    if len(results) == len(prev_results):
+    if number_of_results == number_of_prev_results:
         return True
     else:
-        Logger.log("Trainer", "Mismatch in lengths! {} is not equal to {}".format(len(results), len(prev_results)))
+        Logger.log("Trainer", "Mismatch in lengths! {} is not equal to {}".format(number_of_results,
+                                                                                  number_of_prev_results))
         return False
 
 
+def verify_common_x_path_from_html(common_path: str, prev_common_path: str, html: str) -> bool:
+    """ Verifies that the common XPath `common_path` gives the same results as the previously identified common XPath.
+
+    Parameters
+    ----------
+    common_path : str
+        String representation of the supposed common XPath.
+    prev_common_path : str
+        String representations of the previous common XPath.
+    html:
+        HTML of the page.
+
+    Returns
+    -------
+    bool
+        If the number of identified elements using both XPaths is the same.
+    """
+    return verify_common_x_path(common_path, prev_common_path, _parse_document(html))
+
+
 def combine_x_path_by_or(x_paths: t.List[str]) -> str:
     """Combine multiple XPaths into one, using a logical OR.
 
@@ -133,31 +187,21 @@ def combine_x_path_by_or(x_paths: t.List[str]) -> str:
     """
     if len(x_paths) == 0:
         raise RuntimeError("No XPaths were provided.")
-    working = x_paths.copy()
-    result = x_paths[0]
-    for single_xpath in working[1:]:
-        result = result + " | " + single_xpath
-    return result
-
+    return " | ".join(x_paths)
 
-def calculate_xpath(element: WebElement, driver: TorBrowserDriver) -> str:
-    # Source based on FourTwoOmega's reply
-    # https://stackoverflow.com/questions/4176560/webdriver-get-elements-xpath
-    xpath = driver.execute_script(
-        "gPt=function(c){if(c.id!==''){return\"id('\"+c.id+\"')\"}if(c===document.body){return c.tagName}var "
-        "a=0;var e=c.parentNode.childNodes;for(var b=0;b<e.length;b++){var d=e[b];if(d===c){return gPt(c."
-        "parentNode)+'/'+c.tagName.toLowerCase()+'['+(a+1)+']'}if(d.nodeType===1&&d.tagName===c.tagName)"
-        "{a++}}};return gPt(arguments[0]);", element)
-    if xpath.startswith("BODY"):
-        xpath = xpath[4:len(xpath)]
-        xpath = "/html/body" + xpath
-    return xpath
 
+# Source based on FourTwoOmega's reply
+# https://stackoverflow.com/questions/4176560/webdriver-get-elements-xpath
+# Walks up iteratively and joins the steps once, rather than recursing and concatenating a new string per level
+_GET_XPATH_JS = (
+    "window.__tcGetXPath=function(c){var p=[];while(c.id===''&&c!==document.body){var a=1;for(var s=c.previousSibling;"
+    "s;s=s.previousSibling){if(s.nodeType===1&&s.tagName===c.tagName){a++}}p.push(c.tagName.toLowerCase()+"
+    "'['+a+']');c=c.parentNode}p.push(c.id!==''?\"id('\"+c.id+\"')\":c.tagName);return p.reverse().join('/')};"
+)
 
-def calculate_full_xpath(element: WebElement, driver: TorBrowserDriver) -> str:
-    # https://stackoverflow.com/questions/43003935/get-absolute-xpath-of-web-element
-    return driver.execute_script(
-        """function getAbsoluteXPath(element) {
+# https://stackoverflow.com/questions/43003935/get-absolute-xpath-of-web-element
+_GET_ABSOLUTE_XPATH_JS = """
+        window.__tcGetAbsoluteXPath = function(element) {
             var comp, comps = [];
             var parent = null;
             var xpath = '';
@@ -209,7 +253,69 @@ def calculate_full_xpath(element: WebElement, driver: TorBrowserDriver) -> str:
                 }
             }
             return xpath;
-        }
-        
-        return getAbsoluteXPath(arguments[0]);""", element)
+        };"""
+
+# Defines the functions above on the page once, so later calls only send a short script that invokes them
+_BOOTSTRAP_JS = _GET_XPATH_JS + _GET_ABSOLUTE_XPATH_JS
+
+
+def _execute_xpath_script(driver: TorBrowserDriver, script: str, *args):
+    """Execute `script`, which uses the functions of `_BOOTSTRAP_JS`, defining them first if the page lacks them.
+
+    The functions are defined on the window, so they are gone after every navigation and are then defined again.
+
+    Parameters
+    ----------
+    driver : TorBrowserDriver
+        The driver on whose page `script` is executed.
+    script : str
+        The JavaScript to execute.
+    *args
+        The arguments passed to `script`.
+
+    Return
+    ------
+    any
+        The value returned by `script`.
+    """
+    try:
+        return driver.execute_script(script, *args)
+    except JavascriptException:
+        driver.execute_script(_BOOTSTRAP_JS)
+        return driver.execute_script(script, *args)
 
+
+def _absolute_body_xpath(xpath: str) -> str:
+    """Rewrite an XPath computed relative to the body element into an absolute one."""
+    if xpath.startswith("BODY"):
+        xpath = "/html/body" + xpath[4:]
+    return xpath
+
+
+def calculate_xpath(element: WebElement, driver: TorBrowserDriver) -> str:
+    xpath = _execute_xpath_script(driver, "return window.__tcGetXPath(arguments[0]);", element)
+    return _absolute_body_xpath(xpath)
+
+
+def calculate_xpaths(elements: t.List[WebElement], driver: TorBrowserDriver) -> t.List[str]:
+    """Calculate the XPaths of multiple elements in a single round-trip to the browser.
+
+    Parameters
+    ----------
+    elements : list of WebElement
+        The elements for which the XPaths are calculated.
+    driver : TorBrowserDriver
+        The driver on whose page the `elements` are located.
+
+    Return
+    ------
+    list of str
+        The XPath of every element in `elements`, in the same order.
+    """
+    xpaths = _execute_xpath_script(driver, "return arguments[0].map(function(c){return window.__tcGetXPath(c);});",
+                                   elements)
+    return [_absolute_body_xpath(xpath) for xpath in xpaths]
+
+
+def calculate_full_xpath(element: WebElement, driver: TorBrowserDriver) -> str:
+    return _execute_xpath_script(driver, "return window.__tcGetAbsoluteXPath(arguments[0]);", element)
@@ -1,5 +1,19 @@
 from termcolor import colored
-from datetime import datetime
+import time
+
+# The colored tags are built once, instead of on every call to Logger.log
+_TAG_CACHE = {
+    "crawler": colored("[CRAWLER]", "cyan"),
+    "database": colored("[DATABASE]", "cyan"),
+    "type": colored("[TYPE]", "yellow"),
+    "warning": colored("[WARNING]", "yellow"),
+    "interpreter": colored("[INTERPRETER]", "red"),
+    "blacklist": colored("[BLACKLIST]", "red"),
+    "trainer": colored("[TRAINER]", "magenta"),
+    "error": colored("[ERROR]", "red"),
+    "schedule": colored("[SCHEDULE]", "blue"),
+    "state": colored("[STATE]", "green"),
+}
 
 
 class Logger:
@@ -7,30 +21,12 @@ class Logger:
     @staticmethod
     def log(tag: str, message: str):
         tag_out = Logger.__parse_tag(tag)
-        print(str(datetime.now().strftime("%Y-%m-%d %H:%M:%S")) + ":", tag_out, message)
+        print(time.strftime("%Y-%m-%d %H:%M:%S") + ":", tag_out, message)
 
     @staticmethod
     def __parse_tag(tag: str):
         t = tag.lower()
-        if t == "crawler":
-            return colored("[CRAWLER]", "cyan")
-        elif t == "database":
-            return colored("[DATABASE]", "cyan")
-        elif t == "type":
-            return colored("[TYPE]", "yellow")
-        elif t == "warning":
-            return colored("[WARNING]", "yellow")
-        elif t == "interpreter":
-            return colored("[INTERPRETER]", "red")
-        elif t == "blacklist":
-            return colored("[BLACKLIST]", "red")
-        elif t == "trainer":
-            return colored("[TRAINER]", "magenta")
-        elif t == "error":
-            return colored("[ERROR]", "red")
-        elif t == "schedule":
-            return colored("[SCHEDULE]", "blue")
-        elif t == "state":
-            return colored("[STATE]", "green")
-        else:
-            return colored("[{}]".format(tag.upper()), "white")
+        tag_out = _TAG_CACHE.get(t)
+        if tag_out is None:
+            tag_out = _TAG_CACHE.setdefault(t, colored("[{}]".format(tag.upper()), "white"))
+        return tag_out
@@ -0,0 +1,51 @@
+"""File containing the JSON serialization functions.
+
+orjson is considerably faster than the standard library json module, but it is optional; when it is not installed
+the standard library is used instead. Note that orjson serializes Enum members by value, whereas `default` is called
+for them by the standard library.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj, default=None) -> str:
+    """Serialize `obj` into a JSON string.
+
+    Parameters
+    ----------
+    obj : any
+        The object to serialize.
+    default : callable, optional
+        Called for objects that cannot be serialized otherwise, and should return a serializable representation of
+        them or raise a TypeError.
+
+    Returns
+    -------
+    str
+        The JSON representation of `obj`.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=default).decode()
+    return json.dumps(obj, default=default)
+
+
+def loads(s):
+    """Deserialize the JSON string `s`.
+
+    Parameters
+    ----------
+    s : str or bytes
+        The JSON document to deserialize.
+
+    Returns
+    -------
+    any
+        The Python representation of `s`.
+    """
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)